@@ -8,7 +8,7 @@ python -m pip install --upgrade pip
 
 # Install Python packages
 echo "🐍 Installing Flask and dependencies..."
-pip install flask flask-cors requests
+pip install flask requests orjson brotli
 
 # Install ALL CAD Analysis Libraries for maximum compatibility
 echo "📦 Installing CADQuery..."